@@ -10,11 +10,13 @@ Example:
     config = get_config()
 """
 
+import copy
+import functools
 import json
 import os
 from typing import Any
 
-from jsonschema import validate
+from jsonschema import Draft7Validator
 
 CONFIG_PATH = "./config.json"
 
@@ -74,6 +76,9 @@ CONFIG_SCHEMA = {
     "required": ["searchable_types", "paths"]
 }
 
+Draft7Validator.check_schema(CONFIG_SCHEMA)
+_VALIDATOR = Draft7Validator(CONFIG_SCHEMA)
+
 REQUIRED_PATHS = [
     "bigfiles_output_path",
     "permissions_output_path",
@@ -96,21 +101,34 @@ class ConfigurationError(Exception):
 
 def load_config(path: str) -> Any:
     """
-    Load the configuration from a JSON file or create a default one if it doesn't exist.
+    Load the configuration from a JSON file, or the default one if the file doesn't exist.
 
     Args:
         path (str): The file path of the configuration JSON file.
 
     Returns:
-        Any: The loaded configuration as a Python object.
+        Any: The loaded configuration as a Python object. The default configuration is
+            returned as a copy, so changing it leaves DEFAULT_CONFIG untouched.
     """
     if not os.path.exists(path):
-        with open(path, 'w') as f:
-            json.dump(DEFAULT_CONFIG, f, indent=2)
+        return copy.deepcopy(DEFAULT_CONFIG)
     with open(path, 'r') as f:
         return json.load(f)
 
 
+def create_default_config(path: str) -> None:
+    """
+    Write the default configuration to a JSON file, unless the file already exists.
+
+    Args:
+        path (str): The file path of the configuration JSON file.
+    """
+    if os.path.exists(path):
+        return
+    with open(path, 'w') as f:
+        json.dump(DEFAULT_CONFIG, f, indent=2)
+
+
 def check_config(config: Any) -> None:
     """
     Validate the configuration against the defined schema and check paths.
@@ -122,7 +140,7 @@ def check_config(config: Any) -> None:
         jsonschema.exceptions.ValidationError: If the config doesn't match the schema.
         ConfigurationError: If there are issues with the configuration paths.
     """
-    validate(instance=config, schema=CONFIG_SCHEMA)
+    _VALIDATOR.validate(config)
     check_config_paths(config["paths"])
 
 
@@ -140,23 +158,25 @@ def check_config_paths(config_paths: dict[str, Any]) -> None:
         if path not in config_paths:
             raise ConfigurationError(f"'{path}' is missing in config")
     for path in config_paths.values():
-        if not os.path.isabs(path):
-            path = os.path.abspath(path)
+        path = os.path.abspath(path)
         dir_path = os.path.dirname(path)
-        if not os.path.exists(dir_path):
-            raise ConfigurationError(f"Directory in {path} does not exist")
-
         if not os.access(dir_path, os.W_OK):
+            if not os.path.exists(dir_path):
+                raise ConfigurationError(f"Directory in {path} does not exist")
             raise ConfigurationError(f"No writing access to {dir_path}")
 
-        if os.path.exists(path) and not os.access(path, os.W_OK):
+        if not os.access(path, os.W_OK) and os.path.exists(path):
             raise ConfigurationError(f"No writing access to {path}")
 
 
+@functools.lru_cache(maxsize=1)
 def get_config() -> Any:
     """
     Load and validate the configuration.
 
+    The result is cached for the lifetime of the process. Call `get_config.cache_clear()`
+    to make the next call re-read the configuration file.
+
     Returns:
         Any: The validated configuration object.
 
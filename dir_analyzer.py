@@ -1,39 +1,80 @@
+import copy
+import functools
 import mimetypes
+import operator
 import os
+import queue
+import random
+import sqlite3
 import stat
-from dataclasses import dataclass, field
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextlib import closing, nullcontext
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Annotated, Any
+from itertools import repeat
+from typing import Annotated, Any, Callable, Iterable, Iterator, TextIO
 
 import magic
 import typer
 from humanize import naturalsize
 from rich import print as rich_print
-from rich.console import Console
 from rich.progress import (BarColumn, Progress, SpinnerColumn, TaskID,
                            TextColumn, TimeRemainingColumn)
 from rich.table import Column, Table
 
-from configuration import DEFAULT_CONFIG, get_config
-
-
-@dataclass
+from configuration import (CONFIG_PATH, DEFAULT_CONFIG, create_default_config,
+                           get_config)
+
+PROGRESS_UPDATE_INTERVAL = 1024
+ANALYSIS_BATCH_SIZE = 4096
+WALK_RESULT_QUEUE_SIZE = 256
+WALK_STOP_CHECK_INTERVAL = 0.1
+MAGIC_HEADER_SIZE = 4096
+MAGIC_UNDETERMINED_MIMETYPE = "application/octet-stream"
+EXTENSION_CACHE_SIZE = 1024
+FILE_COUNT_ESTIMATE_PROBES = 4096
+OUTPUT_BUFFER_SIZE = 2**20
+MIMETYPE_CACHE_QUERY_SIZE = 512
+MIMETYPE_CACHE_COMMIT_INTERVAL = 1000
+HAS_FADVISE = hasattr(os, "posix_fadvise")
+FLAGGED_PERMISSIONS = (
+    (stat.S_IWOTH, "world-writable"),
+    (stat.S_ISUID, "SUID is set"),
+    (stat.S_ISGID, "SGID bit set"),
+)
+FLAGGED_PERMISSIONS_MASK = functools.reduce(operator.or_, (bit for bit, _ in FLAGGED_PERMISSIONS))
+# Outside POSIX, st_mode only approximates permissions: on Windows every writable file looks world-writable.
+CHECK_PERMISSIONS = os.name == "posix"
+
+PROGRESS_COLUMNS = (
+    SpinnerColumn(),
+    TimeRemainingColumn(),
+    BarColumn(),
+    TextColumn("{task.completed} files"),
+    TextColumn("{task.fields[action]}... '{task.description}'",
+               markup=False, table_column=Column()),
+)
+
+_THREAD_LOCAL = threading.local()
+_GUESSED_MIMETYPES: dict[str, str] = dict()
+
+
+@dataclass(slots=True)
 class FiletypeInfoStorage:
     """
     A data class to store information collected during filesystem analysis.
 
     Attributes:
         tag (str): The MIME type tag used to identify this file type.
+        displayable_name (str): A human-readable name for this file type.
         found_files (int): The number of files found of this type. Defaults to 0.
         found_size (int): The total size of files found of this type. Defaults to 0.
-        displayable_name (str): A human-readable name for this file type.
-        found_files_paths (list[str]): A list of paths to the files found of this type. Defaults to an empty list.
     """
     tag: str
-    found_files = 0
-    found_size = 0
     displayable_name: str
-    found_files_paths: list[str] = field(default_factory=list)
+    found_files: int = 0
+    found_size: int = 0
 
 
 def check_path(path: str) -> None:
@@ -55,6 +96,40 @@ def check_path(path: str) -> None:
         raise typer.Exit()
 
 
+def check_workers(workers: int, name: str = "number of workers") -> None:
+    """
+    Verify if the given number of workers is positive.
+
+    Args:
+        workers (int): The number of workers to check.
+        name (str): How the number is called in the error message.
+
+    Raises:
+        typer.Exit: If the number of workers is less than one.
+    """
+    if workers < 1:
+        typer.secho(f"Incorrect {name} - should be at least 1",
+                    fg=typer.colors.RED)
+        raise typer.Exit()
+
+
+def check_cache(cache: str | None, thorough: bool) -> None:
+    """
+    Verify that a mimetype cache is only given along with thorough detection.
+
+    Args:
+        cache (str | None): The path to the cache, None if no cache is used.
+        thorough (bool): Whether thorough detection is used.
+
+    Raises:
+        typer.Exit: If a cache is given without thorough detection, which it wouldn't be used by.
+    """
+    if cache is not None and not thorough:
+        typer.secho("Incorrect cache - only used with --thorough",
+                    fg=typer.colors.RED)
+        raise typer.Exit()
+
+
 def check_size_threshold(size_threshold: float) -> None:
     """
     Verify if the given size threshold is non-negative.
@@ -71,137 +146,657 @@ def check_size_threshold(size_threshold: float) -> None:
         raise typer.Exit()
 
 
-def count_files(dir_path: str) -> int:
+DirectoryScan = tuple[str, list[os.DirEntry[str]], list[os.DirEntry[str]]]
+
+
+def scan_directory(dir_path: str) -> DirectoryScan | None:
+    """
+    List a single directory, splitting its entries into directories and other files.
+
+    Symlinks to directories are counted as directories, like `os.walk` does.
+
+    Args:
+        dir_path (str): The path to the directory to scan.
+
+    Returns:
+        DirectoryScan | None: The directory path, its subdirectory entries and its
+            non-directory entries, or None if the directory can't be read.
+    """
+    try:
+        with os.scandir(dir_path) as scandir_it:
+            entries = list(scandir_it)
+    except OSError:
+        return None
+    dirs: list[os.DirEntry[str]] = []
+    files: list[os.DirEntry[str]] = []
+    for entry in entries:
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            is_dir = False
+        if is_dir:
+            dirs.append(entry)
+        else:
+            files.append(entry)
+    return dir_path, dirs, files
+
+
+def get_walkable_dirs(dirs: list[os.DirEntry[str]]) -> list[str]:
+    """
+    Get the paths of the subdirectories to descend into, skipping symlinks.
+
+    Args:
+        dirs (list[os.DirEntry[str]]): The subdirectory entries of a directory.
+
+    Returns:
+        list[str]: The paths of the subdirectories that aren't symlinks.
+    """
+    walkable_dirs = []
+    for entry in dirs:
+        try:
+            is_symlink = entry.is_symlink()
+        except OSError:
+            is_symlink = False
+        if not is_symlink:
+            walkable_dirs.append(entry.path)
+    return walkable_dirs
+
+
+def walk_directory(dir_path: str, threads: int = 1) -> Iterator[DirectoryScan]:
+    """
+    Walk the directory tree, yielding scandir entries instead of names.
+
+    Behaves like `os.walk(dir_path)`, but hands out `os.DirEntry` objects, so callers
+    can use the prebuilt `entry.path` and the stat data cached by `os.scandir`.
+    Unreadable directories are skipped and symlinks to directories are not followed.
+
+    Args:
+        dir_path (str): The path to the directory to walk.
+        threads (int): Number of threads listing directories. With more than one,
+            directories are yielded in no particular order.
+
+    Yields:
+        DirectoryScan: The directory path, its subdirectory entries and its non-directory entries.
+    """
+    if threads > 1:
+        yield from walk_directory_threaded(dir_path, threads)
+        return
+    pending_dirs = [dir_path]
+    while pending_dirs:
+        directory_scan = scan_directory(pending_dirs.pop())
+        if directory_scan is None:
+            continue
+        yield directory_scan
+        pending_dirs.extend(reversed(get_walkable_dirs(directory_scan[1])))
+
+
+def walk_directory_threaded(dir_path: str, threads: int) -> Iterator[DirectoryScan]:
+    """
+    Walk the directory tree with several threads listing directories at once.
+
+    Worker threads take directories from a shared LIFO queue, scan them, report the
+    scan on a result queue and put the subdirectories back on the directory queue.
+    The caller's thread consumes the results, so storages don't need locking.
+    This keeps several directory listings in flight, which pays off on network
+    filesystems and other high-latency storage, and overlaps them with the caller's
+    analysis. The result queue holds at most WALK_RESULT_QUEUE_SIZE scans, so the
+    threads can't get far ahead of a slow caller.
+
+    Args:
+        dir_path (str): The path to the directory to walk.
+        threads (int): Number of threads listing directories.
+
+    Yields:
+        DirectoryScan: The directory path, its subdirectory entries and its non-directory entries.
+    """
+    pending_dirs: queue.LifoQueue[str | None] = queue.LifoQueue()
+    scans: queue.Queue[tuple[DirectoryScan | None, int]] = queue.Queue(maxsize=WALK_RESULT_QUEUE_SIZE)
+    stop_walking = threading.Event()
+
+    def report_scan(scan_result: tuple[DirectoryScan | None, int]) -> bool:
+        while not stop_walking.is_set():
+            try:
+                scans.put(scan_result, timeout=WALK_STOP_CHECK_INTERVAL)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def scan_pending_dirs() -> None:
+        while (root := pending_dirs.get()) is not None and not stop_walking.is_set():
+            directory_scan = scan_directory(root)
+            walkable_dirs = [] if directory_scan is None else get_walkable_dirs(directory_scan[1])
+            # Report the scan before queueing its subdirectories, so the consumer
+            # counts them as outstanding before any of their own scans arrive.
+            if not report_scan((directory_scan, len(walkable_dirs))):
+                return
+            for walkable_dir in walkable_dirs:
+                pending_dirs.put(walkable_dir)
+
+    scanner_threads = [
+        threading.Thread(target=scan_pending_dirs, daemon=True) for _ in range(threads)
+    ]
+    for scanner_thread in scanner_threads:
+        scanner_thread.start()
+    pending_dirs.put(dir_path)
+    outstanding_dirs = 1
+    try:
+        while outstanding_dirs:
+            directory_scan, subdirs_count = scans.get()
+            outstanding_dirs += subdirs_count - 1
+            if directory_scan is not None:
+                yield directory_scan
+    finally:
+        # Threads still busy when the caller stops early see the event; idle ones wake up
+        # on the stop signals, which the LIFO queue hands out before any directories left behind.
+        stop_walking.set()
+        for _ in scanner_threads:
+            pending_dirs.put(None)
+
+
+def count_files(dir_path: str, progress: Progress, walk_threads: int = 1) -> int:
     """
     Count the total number of files in the given directory and its subdirectories.
 
     Args:
         dir_path (str): The path to the directory to count files in.
+        progress (Progress): Progress bar object to show the counting in.
+        walk_threads (int): Number of threads listing directories.
 
     Returns:
         int: The total number of files found.
     """
-    with Progress(
-        SpinnerColumn(),
-        TextColumn("[progress.description]{task.description}"),
-        transient=True,
-    ) as progress:
-        progress.add_task(
-            description=f"Counting files in `{dir_path}` for estimation...", total=None)
-        return sum(len(files) for _, _, files in os.walk(dir_path))
+    task_id = progress.add_task(
+        description=dir_path, total=None, action="Counting files for estimation")
+    file_count = 0
+    for _, _, files in walk_directory(dir_path, walk_threads):
+        file_count += len(files)
+        progress.update(task_id, completed=file_count)
+    progress.remove_task(task_id)
+    return file_count
 
 
-def analyze_files_mimetype(
+def estimate_file_count(dir_path: str, probes: int = FILE_COUNT_ESTIMATE_PROBES) -> int:
+    """
+    Estimate the total number of files in the given directory and its subdirectories.
+
+    Uses Knuth's tree size estimator: each probe descends from the root along randomly
+    chosen subdirectories down to a leaf, and counts the files of every directory on
+    the path weighted by the product of the branching factors above it. The mean over
+    all probes is an unbiased estimate of the file count, obtained by listing only a
+    few directories per probe instead of the whole tree.
+
+    Args:
+        dir_path (str): The path to the directory to estimate the file count of.
+        probes (int): Number of random root-to-leaf paths to sample.
+
+    Returns:
+        int: The estimated number of files.
+    """
+    scanned_dirs: dict[str, tuple[int, list[str]]] = dict()
+    weighted_file_count = 0
+    for _ in range(probes):
+        probe_path = dir_path
+        weight = 1
+        while True:
+            if probe_path not in scanned_dirs:
+                directory_scan = scan_directory(probe_path)
+                if directory_scan is None:
+                    scanned_dirs[probe_path] = (0, [])
+                else:
+                    _, dirs, files = directory_scan
+                    scanned_dirs[probe_path] = (len(files), get_walkable_dirs(dirs))
+            file_count, walkable_dirs = scanned_dirs[probe_path]
+            weighted_file_count += weight * file_count
+            if not walkable_dirs:
+                break
+            weight *= len(walkable_dirs)
+            probe_path = random.choice(walkable_dirs)
+    return round(weighted_file_count / probes)
+
+
+def is_regular_file(entry: os.DirEntry[str]) -> bool:
+    """
+    Check whether a directory entry is a regular file. Symlinks are not followed.
+
+    Args:
+        entry (os.DirEntry[str]): The entry to check.
+
+    Returns:
+        bool: True if the entry is a regular file, False otherwise or if it can't be checked.
+    """
+    try:
+        return entry.is_file(follow_symlinks=False)
+    except OSError:
+        return False
+
+
+def stat_file(entry: os.DirEntry[str]) -> os.stat_result | None:
+    """
+    Get the stat result of a directory entry.
+
+    Args:
+        entry (os.DirEntry[str]): The entry to stat.
+
+    Returns:
+        os.stat_result | None: The stat result, or None if the entry can't be accessed.
+    """
+    try:
+        return entry.stat()
+    except OSError:
+        return None
+
+
+def read_file_header(target_path: str) -> bytes:
+    """
+    Read the beginning of a file, which is the part libmagic inspects.
+
+    Where supported, the kernel is told the access is random so that it doesn't
+    read ahead past the header.
+
+    Args:
+        target_path (str): The path to the file to read.
+
+    Returns:
+        bytes: Up to MAGIC_HEADER_SIZE bytes from the start of the file.
+    """
+    fd = os.open(target_path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        if HAS_FADVISE:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_RANDOM)
+        return os.read(fd, MAGIC_HEADER_SIZE)
+    finally:
+        os.close(fd)
+
+
+def get_magic() -> magic.Magic:
+    """
+    Get the libmagic cookie of the current thread, creating it on first use.
+
+    A magic.Magic instance serializes its calls with a lock, so every thread gets its own
+    to let detections run in parallel.
+
+    Returns:
+        magic.Magic: The cookie of the current thread, set up to detect mimetypes.
+    """
+    cookie = getattr(_THREAD_LOCAL, "magic", None)
+    if cookie is None:
+        cookie = _THREAD_LOCAL.magic = magic.Magic(mime=True)
+    return cookie
+
+
+def detect_content_mimetype(target_path: str, regular_file: bool) -> tuple[str, bool]:
+    """
+    Detect the mimetype of a file based on its content, using libmagic.
+
+    Only the header of a regular file is read and handed to libmagic. If the header
+    is not enough to tell the type (e.g. an mp3 behind a large ID3 tag), libmagic reads
+    the file itself, as it does for empty files, symlinks and special files.
+
+    Args:
+        target_path (str): The path to the file to analyze.
+        regular_file (bool): Whether the file is a regular file.
+
+    Returns:
+        tuple[str, bool]: The detected mimetype, and whether the header alone was enough to tell it.
+
+    Raises:
+        OSError: If the file can't be read.
+        magic.MagicException: If libmagic fails to analyze the file.
+    """
+    cookie = get_magic()
+    header = read_file_header(target_path) if regular_file else b""
+    if header:
+        mime_type = cookie.from_buffer(header)
+        if mime_type != MAGIC_UNDETERMINED_MIMETYPE:
+            return mime_type, True
+    return cookie.from_file(target_path), False
+
+
+def detect_mimetype(
         target_path: str,
-        result_storages: dict[str, FiletypeInfoStorage],
-        others_storage: FiletypeInfoStorage,
-        totals_storage: FiletypeInfoStorage,
         thorough: bool,
-) -> tuple[dict[str, FiletypeInfoStorage], FiletypeInfoStorage, FiletypeInfoStorage]:
+        regular_file: bool,
+        extension_mimetypes: dict[str, str] | None = None,
+) -> str | None:
     """
-    Analyze the mimetype of a file and update the corresponding storage.
+    Detect the mimetype of a file.
+
+    With extension_mimetypes, thorough mode only runs libmagic on the first regular file
+    of each extension and reuses its mimetype for the following files with that extension.
+    Only mimetypes told from a file's header are reused: an empty file or a header libmagic
+    can't make sense of says nothing about the other files sharing its extension.
+
+    Errors are returned as None instead of being raised, so that a single unreadable
+    file does not abort a batch of detections running in a worker thread.
 
     Args:
         target_path (str): The path to the file to analyze.
-        result_storages (dict[str, FiletypeInfoStorage]): Dictionary of storages for different file types.
-        others_storage (FiletypeInfoStorage): Storage for files that don't match known types.
-        totals_storage (FiletypeInfoStorage): Storage for overall totals.
         thorough (bool): Whether to use thorough analysis (magic library) or not.
+        regular_file (bool): Whether the file is a regular file.
+        extension_mimetypes (dict[str, str] | None): Mimetypes detected so far per lowercase extension,
+            filled in as new extensions are found. Files sharing an extension share a mimetype in
+            thorough mode if given.
 
     Returns:
-        tuple: Updated result_storages, others_storage, and totals_storage.
+        str | None: The detected mimetype ("" if unknown), or None if the file couldn't be analyzed.
     """
     if thorough:
-        mime_type = magic.from_file(target_path, mime=True)
-    else:
-        mime_type, _ = mimetypes.guess_type(target_path, strict=False)
-        if mime_type is None:
-            mime_type = ""
-    file_size = os.path.getsize(target_path)
-    totals_storage.found_files += 1
-    totals_storage.found_size += file_size
-    for storage in result_storages.values():
-        if mime_type.startswith(storage.tag):
-            storage.found_files += 1
-            storage.found_size += file_size
-            return result_storages, others_storage, totals_storage
-    others_storage.found_files += 1
-    others_storage.found_size += file_size
-    return result_storages, others_storage, totals_storage
+        extension = ""
+        if extension_mimetypes is not None and regular_file:
+            extension = os.path.splitext(target_path)[1].lower()
+            if extension in extension_mimetypes:
+                return extension_mimetypes[extension]
+        try:
+            mime_type, from_header = detect_content_mimetype(target_path, regular_file)
+        except (OSError, magic.MagicException):
+            return None
+        if (
+            extension
+            and from_header
+            and not mime_type.startswith("inode/")
+            and extension_mimetypes is not None
+            and len(extension_mimetypes) < EXTENSION_CACHE_SIZE
+        ):
+            extension_mimetypes[extension] = mime_type
+        return mime_type
+    return guess_mimetype(target_path)
+
+
+def guess_mimetype(target_path: str) -> str:
+    """
+    Guess the mimetype of a file from its extension.
 
+    Results of mimetypes.guess_type are cached per extension. Extensions that
+    mimetypes treats as compression or suffix aliases (e.g. ".gz", ".tgz") depend
+    on the rest of the name, so they are never cached.
+
+    Args:
+        target_path (str): The path to the file.
 
-def analyze_file_permissions(file_path: str) -> str | None:
+    Returns:
+        str: The guessed mimetype, or "" if unknown.
+    """
+    extension = os.path.splitext(target_path)[1]
+    mime_type = _GUESSED_MIMETYPES.get(extension)
+    if mime_type is not None:
+        return mime_type
+    mime_type, _ = mimetypes.guess_type(target_path, strict=False)
+    if mime_type is None:
+        mime_type = ""
+    lowered_extension = extension.lower()
+    if (
+        lowered_extension not in mimetypes.suffix_map
+        and extension not in mimetypes.encodings_map
+        and lowered_extension not in mimetypes.encodings_map
+        and len(_GUESSED_MIMETYPES) < EXTENSION_CACHE_SIZE
+    ):
+        _GUESSED_MIMETYPES[extension] = mime_type
+    return mime_type
+
+
+def detect_mimetypes(
+        paths: list[str],
+        regular_files: list[bool],
+        thorough: bool,
+        extension_mimetypes: dict[str, str] | None = None,
+        executor: Executor | None = None,
+) -> Iterator[str | None]:
     """
-    Analyze the permissions of a file and return a warning message if necessary.
+    Detect the mimetypes of files, in the same order as the given paths.
 
     Args:
-        file_path (str): The path to the file to analyze.
+        paths (list[str]): The paths to the files to analyze.
+        regular_files (list[bool]): Whether each file is a regular file.
+        thorough (bool): Whether to use thorough analysis (magic library) or not.
+        extension_mimetypes (dict[str, str] | None): Mimetypes detected so far per lowercase extension,
+            to reuse for files sharing an extension in thorough mode. Extensions aren't trusted if None.
+        executor (Executor | None): Pool to run the detection in. Runs in the calling thread if None.
 
     Returns:
-        str | None: A warning message if the file has concerning permissions, None otherwise.
+        Iterator[str | None]: The result of detect_mimetype for each file.
     """
-    mode = os.stat(file_path).st_mode
-    warning_message = None
-    if mode & stat.S_IWOTH:
-        warning_message = f"WARNING: world-writable - '{file_path}'"
+    if executor is None:
+        return map(detect_mimetype, paths, repeat(thorough), regular_files, repeat(extension_mimetypes))
+    return executor.map(detect_mimetype, paths, repeat(thorough), regular_files, repeat(extension_mimetypes))
+
 
-    if mode & stat.S_ISUID:
-        warning_message = f"WARNING: SUID is set - '{file_path}'"
+def open_mimetype_cache(cache_path: str) -> sqlite3.Connection:
+    """
+    Open the SQLite database caching thorough detection results, creating it if needed.
 
-    if mode & stat.S_ISGID:
-        warning_message = f"WARNING: SGID bit set - '{file_path}'"
+    Each row records whether it was written with trusted extensions, since such a mimetype
+    may have been copied from another file instead of read from the file itself.
 
-    return warning_message
+    Args:
+        cache_path (str): The path to the database file.
+
+    Returns:
+        sqlite3.Connection: The connection to the cache.
+    """
+    connection = sqlite3.connect(cache_path)
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS mimetypes ("
+        "path TEXT PRIMARY KEY, mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL, mime_type TEXT NOT NULL, "
+        "trusted_extensions INTEGER NOT NULL"
+        ") WITHOUT ROWID"
+    )
+    return connection
+
+
+def load_cached_mimetypes(
+        mimetype_cache: sqlite3.Connection, paths: list[str], trusted_extensions: bool = False,
+) -> dict[str, tuple[int, int, str]]:
+    """
+    Look up the cached detection results of files.
 
+    Args:
+        mimetype_cache (sqlite3.Connection): The connection to the cache.
+        paths (list[str]): The paths to the files to look up.
+        trusted_extensions (bool): Whether results written with trusted extensions are accepted too.
 
-def analyze_dir_permissions(dir_path: str) -> str | None:
+    Returns:
+        dict[str, tuple[int, int, str]]: The mtime in nanoseconds, size and mimetype recorded
+            for each path found in the cache.
+    """
+    cached_mimetypes = dict()
+    trust_condition = "" if trusted_extensions else " AND NOT trusted_extensions"
+    for start in range(0, len(paths), MIMETYPE_CACHE_QUERY_SIZE):
+        paths_chunk = paths[start:start + MIMETYPE_CACHE_QUERY_SIZE]
+        placeholders = ",".join("?" * len(paths_chunk))
+        rows = mimetype_cache.execute(
+            f"SELECT path, mtime_ns, size, mime_type FROM mimetypes WHERE path IN ({placeholders}){trust_condition}",
+            paths_chunk,
+        )
+        for path, mtime_ns, size, mime_type in rows:
+            cached_mimetypes[path] = (mtime_ns, size, mime_type)
+    return cached_mimetypes
+
+
+def detect_mimetypes_cached(
+        mimetype_cache: sqlite3.Connection,
+        paths: list[str],
+        file_stats: list[os.stat_result | None],
+        regular_files: list[bool],
+        extension_mimetypes: dict[str, str] | None = None,
+        executor: Executor | None = None,
+) -> list[str | None]:
+    """
+    Detect the mimetypes of files thoroughly, reusing cached results of unchanged files.
+
+    A cached result is reused if the file still has the recorded mtime and size. Other
+    files are detected and their results are stored in the cache. Results are keyed by
+    absolute path, so they are shared whichever way the analyzed directory was given.
+    Results written with trusted extensions are only reused when extensions are trusted.
+
+    Args:
+        mimetype_cache (sqlite3.Connection): The connection to the cache.
+        paths (list[str]): The paths to the files to analyze.
+        file_stats (list[os.stat_result | None]): The stat result of each file, None if it couldn't be read.
+        regular_files (list[bool]): Whether each file is a regular file.
+        extension_mimetypes (dict[str, str] | None): Mimetypes detected so far per lowercase extension,
+            to reuse for files sharing an extension. Extensions aren't trusted if None.
+        executor (Executor | None): Pool to run the detection in. Runs in the calling thread if None.
+
+    Returns:
+        list[str | None]: The mimetype of each file, or None if it couldn't be analyzed.
+    """
+    trusted_extensions = extension_mimetypes is not None
+    cache_keys = [os.path.abspath(path) for path in paths]
+    cached_mimetypes = load_cached_mimetypes(mimetype_cache, cache_keys, trusted_extensions)
+    mime_types: list[str | None] = [None] * len(paths)
+    undetected_indexes = []
+    for index, (cache_key, file_stat) in enumerate(zip(cache_keys, file_stats)):
+        cached_mimetype = cached_mimetypes.get(cache_key)
+        if (
+            cached_mimetype is not None
+            and file_stat is not None
+            and cached_mimetype[:2] == (file_stat.st_mtime_ns, file_stat.st_size)
+        ):
+            mime_types[index] = cached_mimetype[2]
+        else:
+            undetected_indexes.append(index)
+    detected_mimetypes = detect_mimetypes(
+        [paths[index] for index in undetected_indexes],
+        [regular_files[index] for index in undetected_indexes],
+        True, extension_mimetypes, executor,
+    )
+    new_rows = []
+    for index, mime_type in zip(undetected_indexes, detected_mimetypes):
+        mime_types[index] = mime_type
+        file_stat = file_stats[index]
+        if mime_type is not None and file_stat is not None:
+            new_rows.append(
+                (cache_keys[index], file_stat.st_mtime_ns, file_stat.st_size, mime_type, trusted_extensions))
+    mimetype_cache.executemany(
+        "INSERT OR REPLACE INTO mimetypes (path, mtime_ns, size, mime_type, trusted_extensions) "
+        "VALUES (?, ?, ?, ?, ?)",
+        new_rows,
+    )
+    return mime_types
+
+
+def find_mimetype_storage(
+        mime_type: str,
+        result_storages: dict[str, FiletypeInfoStorage],
+        others_storage: FiletypeInfoStorage,
+) -> FiletypeInfoStorage:
+    """
+    Find the storage for a mimetype: the first one whose tag the mimetype starts with.
+
+    Args:
+        mime_type (str): The mimetype to find the storage for.
+        result_storages (dict[str, FiletypeInfoStorage]): Dictionary of storages for different file types.
+        others_storage (FiletypeInfoStorage): Storage for files that don't match known types.
+
+    Returns:
+        FiletypeInfoStorage: The matching storage, or others_storage if none matches.
+    """
+    for storage in result_storages.values():
+        if mime_type.startswith(storage.tag):
+            return storage
+    return others_storage
+
+
+def analyze_files_mimetype(
+        file_size: int,
+        mime_type: str,
+        result_storages: dict[str, FiletypeInfoStorage],
+        others_storage: FiletypeInfoStorage,
+        totals_storage: FiletypeInfoStorage,
+        storages_by_mimetype: dict[str, FiletypeInfoStorage],
+) -> None:
+    """
+    Sort a file into the storage matching its mimetype and update the storage in place.
+
+    Args:
+        file_size (int): The size of the file in bytes.
+        mime_type (str): The mimetype of the file, as returned by detect_mimetype.
+        result_storages (dict[str, FiletypeInfoStorage]): Dictionary of storages for different file types.
+        others_storage (FiletypeInfoStorage): Storage for files that don't match known types.
+        totals_storage (FiletypeInfoStorage): Storage for overall totals.
+        storages_by_mimetype (dict[str, FiletypeInfoStorage]): Mimetypes already sorted into storages,
+            filled in as new mimetypes are found.
+    """
+    totals_storage.found_files += 1
+    totals_storage.found_size += file_size
+    storage = storages_by_mimetype.get(mime_type)
+    if storage is None:
+        storage = find_mimetype_storage(mime_type, result_storages, others_storage)
+        storages_by_mimetype[mime_type] = storage
+    storage.found_files += 1
+    storage.found_size += file_size
+
+
+def analyze_file_permissions(file_path: str, mode: int) -> list[str]:
+    """
+    Analyze the permissions of a file and return warning messages if necessary.
+
+    Args:
+        file_path (str): The path to the file to analyze.
+        mode (int): The st_mode of the file.
+
+    Returns:
+        list[str]: A warning message for each concerning permission of the file, empty if there are none.
+    """
+    if not mode & FLAGGED_PERMISSIONS_MASK:
+        return []
+    return [
+        f"WARNING: {description} - '{file_path}'"
+        for permission_bit, description in FLAGGED_PERMISSIONS
+        if mode & permission_bit
+    ]
+
+
+def analyze_dir_permissions(dir_path: str, mode: int) -> str | None:
     """
     Analyze the permissions of a directory and return a warning message if necessary.
 
     Args:
         dir_path (str): The path to the directory to analyze.
+        mode (int): The st_mode of the directory.
 
     Returns:
         str | None: A warning message if the directory is world-writable, None otherwise.
     """
     warning_message = None
-    if os.stat(dir_path).st_mode & stat.S_IWOTH:
+    if mode & stat.S_IWOTH:
         warning_message = f"WARNING: world-writable - '{dir_path}'"
     return warning_message
 
 
 def analyze_filesize(
     file_path: str,
+    file_size: int,
     bigfiles_storage: FiletypeInfoStorage,
-    size_threshold: float
-) -> FiletypeInfoStorage:
+    size_threshold: float,
+    report_bigfile: Callable[[str], None],
+) -> None:
     """
-    Analyze the size of a file and update the bigfiles_storage if it exceeds the threshold.
+    Analyze the size of a file and update the bigfiles_storage in place if it exceeds the threshold.
 
     Args:
         file_path (str): The path to the file to analyze.
+        file_size (int): The size of the file in bytes.
         bigfiles_storage (FiletypeInfoStorage): Storage for big files information.
         size_threshold (float): The size threshold in GB.
-
-    Returns:
-        FiletypeInfoStorage: Updated bigfiles_storage.
+        report_bigfile (Callable[[str], None]): Called with the path of the file if it is big.
     """
-    file_size = os.path.getsize(file_path)
     if file_size > size_threshold * (2**30):
         bigfiles_storage.found_files += 1
         bigfiles_storage.found_size += file_size
-        bigfiles_storage.found_files_paths.append(file_path)
-    return bigfiles_storage
+        report_bigfile(file_path)
 
 
-def analyze_directories(root: str, dirs: list[str], permission_warnings: list[str]) -> int:
+def analyze_directories(
+    dirs: list[os.DirEntry[str]], report_permission_warning: Callable[[str], None],
+) -> int:
     """
-    Analyze permissions of directories and collect warnings.
+    Analyze permissions of directories and report warnings.
 
     Args:
-        root (str): The root directory path.
-        dirs (list[str]): List of directory names to analyze.
-        permission_warnings (list[str]): List to collect permission warnings.
+        dirs (list[os.DirEntry[str]]): List of directory entries to analyze.
+        report_permission_warning (Callable[[str], None]): Called with each permission warning.
 
     Returns:
         int: Number of errors encountered during analysis.
@@ -210,55 +805,94 @@ def analyze_directories(root: str, dirs: list[str], permission_warnings: list[st
     for dir in dirs:
         try:
             permission_warning = analyze_dir_permissions(
-                os.path.join(root, dir))
+                dir.path, dir.stat().st_mode)
             if permission_warning:
-                permission_warnings.append(permission_warning)
+                report_permission_warning(permission_warning)
         except OSError:
             errors += 1
     return errors
 
 
 def analyze_files(
-    root: str, files: list[str], progress: Progress, task_id: TaskID,
+    files: list[os.DirEntry[str]], progress: Progress, task_id: TaskID,
     result_storages: dict[str, FiletypeInfoStorage], others_storage: FiletypeInfoStorage,
     totals_storage: FiletypeInfoStorage, bigfiles_storage: FiletypeInfoStorage,
-    permission_warnings: list[str], thorough: bool, size_threshold: float
+    storages_by_mimetype: dict[str, FiletypeInfoStorage],
+    report_permission_warning: Callable[[str], None], report_bigfile: Callable[[str], None],
+    thorough: bool, size_threshold: float, executor: Executor | None = None,
+    extension_mimetypes: dict[str, str] | None = None,
+    stat_executor: Executor | None = None, mimetype_cache: sqlite3.Connection | None = None,
 ) -> int:
     """
-    Analyze files in a directory, updating various storages and collecting warnings.
+    Analyze files in a directory, updating various storages and reporting warnings and big files.
 
     Args:
-        root (str): The root directory path.
-        files (list[str]): List of file names to analyze.
+        files (list[os.DirEntry[str]]): List of file entries to analyze.
         progress (Progress): Progress bar object.
         task_id (TaskID): ID of the current task in the progress bar.
         result_storages (dict[str, FiletypeInfoStorage]): Dictionary of storages for different file types.
         others_storage (FiletypeInfoStorage): Storage for files that don't match known types.
         totals_storage (FiletypeInfoStorage): Storage for overall totals.
         bigfiles_storage (FiletypeInfoStorage): Storage for big files information.
-        permission_warnings (list[str]): List to collect permission warnings.
+        storages_by_mimetype (dict[str, FiletypeInfoStorage]): Lookup of already sorted mimetypes.
+        report_permission_warning (Callable[[str], None]): Called with each permission warning.
+        report_bigfile (Callable[[str], None]): Called with the path of each big file.
         thorough (bool): Whether to use thorough analysis or not.
         size_threshold (float): The size threshold in GB for big files.
+        executor (Executor | None): Pool to run mimetype detection in. Runs in the calling thread if None.
+        extension_mimetypes (dict[str, str] | None): Thorough detection results per lowercase extension
+            to reuse for files with the same extension. Extensions aren't trusted if None.
+        stat_executor (Executor | None): Pool to stat the files in. Runs in the calling thread if None.
+        mimetype_cache (sqlite3.Connection | None): Cache of thorough detection results to reuse and fill.
 
     Returns:
         int: Number of errors encountered during analysis.
     """
     errors = 0
-    for file in files:
-        analysis_target_path = os.path.join(root, file)
-        progress.update(task_id, description=analysis_target_path, advance=1)
-        try:
-            permission_warning = analyze_file_permissions(analysis_target_path)
-            if permission_warning:
-                permission_warnings.append(permission_warning)
+    pending_progress = 0
+    paths = [file.path for file in files]
+    regular_files = [is_regular_file(file) for file in files]
+    file_stats: Iterable[os.stat_result | None]
+    if stat_executor is None:
+        file_stats = map(stat_file, files)
+    else:
+        file_stats = stat_executor.map(stat_file, files)
+    mime_types: Iterable[str | None]
+    if thorough and mimetype_cache is not None:
+        file_stats = list(file_stats)
+        mime_types = detect_mimetypes_cached(
+            mimetype_cache, paths, file_stats, regular_files, extension_mimetypes, executor)
+    else:
+        mime_types = detect_mimetypes(paths, regular_files, thorough, extension_mimetypes, executor)
+    # A zero mask turns the per-file permission test off when permissions aren't checked.
+    flagged_permissions_mask = FLAGGED_PERMISSIONS_MASK if CHECK_PERMISSIONS else 0
+    for file, file_stat, mime_type in zip(files, file_stats, mime_types):
+        analysis_target_path = file.path
+        pending_progress += 1
+        if pending_progress == PROGRESS_UPDATE_INTERVAL:
+            progress.update(
+                task_id, description=analysis_target_path, advance=pending_progress)
+            pending_progress = 0
+        if file_stat is None:
+            errors += 1
+            continue
+        if file_stat.st_mode & flagged_permissions_mask:
+            for permission_warning in analyze_file_permissions(analysis_target_path, file_stat.st_mode):
+                report_permission_warning(permission_warning)
 
-            result_storages, others_storage, totals_storage = analyze_files_mimetype(
-                analysis_target_path, result_storages, others_storage, totals_storage, thorough,
-            )
-            bigfiles_storage = analyze_filesize(
-                analysis_target_path, bigfiles_storage, size_threshold)
-        except (OSError, magic.MagicException):
+        if mime_type is None:
             errors += 1
+            continue
+        file_size = file_stat.st_size
+        analyze_files_mimetype(
+            file_size, mime_type, result_storages, others_storage, totals_storage,
+            storages_by_mimetype,
+        )
+        analyze_filesize(
+            analysis_target_path, file_size, bigfiles_storage, size_threshold, report_bigfile)
+    if pending_progress:
+        progress.update(
+            task_id, description=paths[-1], advance=pending_progress)
     return errors
 
 
@@ -267,21 +901,42 @@ def analyze_filesystem(
         searchable_types_config: dict[str, Any],
         thorough: bool,
         size_threshold: float,
+        progress: Progress,
+        bigfiles_output: TextIO,
+        permissions_output: TextIO,
         file_count: int | None = None,
-) -> tuple[dict[str, FiletypeInfoStorage], FiletypeInfoStorage, FiletypeInfoStorage, FiletypeInfoStorage, list[str], int]:
+        workers: int = 1,
+        trust_extensions: bool = False,
+        walk_threads: int = 1,
+        stat_threads: int = 1,
+        mimetype_cache: sqlite3.Connection | None = None,
+) -> tuple[dict[str, FiletypeInfoStorage], FiletypeInfoStorage, FiletypeInfoStorage, FiletypeInfoStorage, int, int]:
     """
     Analyze the filesystem starting from the given root directory.
 
     This function walks through the directory tree, analyzing file types, sizes, and permissions.
     It collects statistics on different file types, identifies big files, and checks for potential
-    permission issues.
+    permission issues. Permissions are only checked on POSIX systems.
+
+    Big file paths and permission warnings are written to the given outputs, one per line,
+    as they are found. The files of a directory are analyzed in batches of ANALYSIS_BATCH_SIZE,
+    so the thread pools never hold more pending work than one batch.
 
     Args:
         root_dir_path (str): The path to the root directory to start the analysis from.
         searchable_types_config (dict[str, Any]): Configuration dictionary for searchable file types.
         thorough (bool): Whether to use thorough (content-based) mimetype detection.
         size_threshold (float): The size threshold in GB for identifying big files.
+        progress (Progress): Progress bar object to show the analysis in.
+        bigfiles_output (TextIO): File to write the paths of big files to.
+        permissions_output (TextIO): File to write permission warnings to.
         file_count (int | None): The total number of files to be analyzed (for progress tracking).
+        workers (int): Number of threads used for thorough mimetype detection.
+        trust_extensions (bool): Whether to reuse thorough detection results for files with the same extension.
+        walk_threads (int): Number of threads listing directories.
+        stat_threads (int): Number of threads reading file metadata.
+        mimetype_cache (sqlite3.Connection | None): Cache of thorough detection results to reuse and fill.
+            Committed every MIMETYPE_CACHE_COMMIT_INTERVAL new results and at the end.
 
     Returns:
         tuple: A tuple containing:
@@ -289,7 +944,7 @@ def analyze_filesystem(
             - FiletypeInfoStorage: Storage object for files not matching any searchable type.
             - FiletypeInfoStorage: Storage object for overall totals.
             - FiletypeInfoStorage: Storage object for big files.
-            - list[str]: List of permission warnings.
+            - int: Count of permission warnings.
             - int: Count of errors encountered during analysis.
     """
     result_storages = {
@@ -298,52 +953,70 @@ def analyze_filesystem(
     others_storage = FiletypeInfoStorage(tag="None", displayable_name="Other")
     totals_storage = FiletypeInfoStorage("None", "Total")
     bigfiles_storage = FiletypeInfoStorage("None", "Big")
-    permission_warnings: list[str] = list()
+    storages_by_mimetype: dict[str, FiletypeInfoStorage] = dict()
+    # Learned afresh on every run, so that a tree's extensions never vouch for another tree's files.
+    extension_mimetypes: dict[str, str] | None = dict() if trust_extensions else None
+    permission_warnings_count = 0
     errors_count = 0
-    if file_count:
-        progress = Progress(
-            SpinnerColumn(),
-            TimeRemainingColumn(),
-            BarColumn(),
-            TextColumn(
-                "Analyzing... '{task.description}'", table_column=Column()),
-            refresh_per_second=60,
-            speed_estimate_period=1,
-            transient=True,
-        )
-    else:
-        progress = Progress(
-            SpinnerColumn(),
-            TextColumn(
-                "Analyzing... '{task.description}'", table_column=Column()),
-            refresh_per_second=60,
-            transient=True,
-        )
-    progress.start()
+
+    def report_permission_warning(warning_message: str) -> None:
+        nonlocal permission_warnings_count
+        permission_warnings_count += 1
+        permissions_output.write(warning_message + "\n")
+
+    def report_bigfile(file_path: str) -> None:
+        bigfiles_output.write(file_path + "\n")
+
+    committed_changes = 0 if mimetype_cache is None else mimetype_cache.total_changes
     analysis_task_id = progress.add_task(
-        description=root_dir_path, total=file_count, completed=0
+        description=root_dir_path, total=file_count, completed=0, action="Analyzing"
     )
-    for root, dirs, files in os.walk(root_dir_path):
-        errors_count += analyze_directories(
-            root, dirs, permission_warnings
-        )
-        errors_count += analyze_files(
-            root, files, progress, analysis_task_id,
-            result_storages, others_storage, totals_storage,
-            bigfiles_storage, permission_warnings,
-            thorough, size_threshold
-        )
-    progress.stop()
+    with (
+        ThreadPoolExecutor(max_workers=workers) if thorough and workers > 1 else nullcontext() as executor,
+        ThreadPoolExecutor(max_workers=stat_threads) if stat_threads > 1 else nullcontext() as stat_executor,
+    ):
+        for _, dirs, files in walk_directory(root_dir_path, walk_threads):
+            if CHECK_PERMISSIONS:
+                errors_count += analyze_directories(
+                    dirs, report_permission_warning
+                )
+            for batch_start in range(0, len(files), ANALYSIS_BATCH_SIZE):
+                errors_count += analyze_files(
+                    files[batch_start:batch_start + ANALYSIS_BATCH_SIZE], progress, analysis_task_id,
+                    result_storages, others_storage, totals_storage,
+                    bigfiles_storage, storages_by_mimetype, report_permission_warning, report_bigfile,
+                    thorough, size_threshold, executor, extension_mimetypes, stat_executor, mimetype_cache
+                )
+                if mimetype_cache is not None and mimetype_cache.total_changes - committed_changes >= MIMETYPE_CACHE_COMMIT_INTERVAL:
+                    mimetype_cache.commit()
+                    committed_changes = mimetype_cache.total_changes
+    if mimetype_cache is not None:
+        mimetype_cache.commit()
+    progress.remove_task(analysis_task_id)
     return (
         result_storages,
         others_storage,
         totals_storage,
         bigfiles_storage,
-        permission_warnings,
+        permission_warnings_count,
         errors_count,
     )
 
 
+def build_storage_row(name: str, storage: FiletypeInfoStorage) -> tuple[str, str, str]:
+    """
+    Format a storage as a row of the analysis results table.
+
+    Args:
+        name (str): The name shown in the first column.
+        storage (FiletypeInfoStorage): The storage to format.
+
+    Returns:
+        tuple[str, str, str]: The name, the number of files found and their human-readable size.
+    """
+    return name, str(storage.found_files), str(naturalsize(storage.found_size))
+
+
 def build_rich_table(
         result_storages: dict[str, FiletypeInfoStorage],
         others_storage: FiletypeInfoStorage,
@@ -366,27 +1039,21 @@ def build_rich_table(
     Returns:
         Table: A rich table containing the analysis results.
     """
+    type_rows = [
+        build_storage_row(storage.displayable_name, storage)
+        for storage in (*result_storages.values(), others_storage)
+    ]
+    bigfiles_row = build_storage_row("Big Files", bigfiles_storage)
+    totals_row = build_storage_row("Totals", totals_storage)
+
     result_table = Table(title="Directory analysis results")
     result_table.add_column("Media type")
     result_table.add_column("Files found")
     result_table.add_column("Size")
-    for storage in result_storages.values():
-        result_table.add_row(
-            storage.displayable_name,
-            str(storage.found_files),
-            str(naturalsize(storage.found_size)),
-        )
-    result_table.add_row(
-        others_storage.displayable_name,
-        str(others_storage.found_files),
-        str(naturalsize(others_storage.found_size)),
-    )
+    for row in type_rows:
+        result_table.add_row(*row)
     result_table.add_section()
-    result_table.add_row(
-        "Big Files",
-        str(bigfiles_storage.found_files),
-        str(naturalsize(bigfiles_storage.found_size))
-    )
+    result_table.add_row(*bigfiles_row)
     result_table.add_row(f"[italic]Files bigger than {size_threshold} GB")
     result_table.add_section()
     result_table.add_row(
@@ -395,14 +1062,67 @@ def build_rich_table(
         "n/a",
     )
     result_table.add_section()
-    result_table.add_row(
-        "Totals",
-        str(totals_storage.found_files),
-        str(naturalsize(totals_storage.found_size)),
-    )
+    result_table.add_row(*totals_row)
     return result_table
 
 
+def build_plain_table(
+        result_storages: dict[str, FiletypeInfoStorage],
+        others_storage: FiletypeInfoStorage,
+        totals_storage: FiletypeInfoStorage,
+        bigfiles_storage: FiletypeInfoStorage,
+        errored_files_count: int,
+        size_threshold: float,
+) -> str:
+    """
+    Build a plain text table with the analysis results, laid out like the rich table.
+
+    Used for writing the results to a file, where rich's styling and layout passes
+    bring nothing.
+
+    Args:
+        result_storages (dict[str, FiletypeInfoStorage]): Dictionary of storages for different file types.
+        others_storage (FiletypeInfoStorage): Storage for files that don't match known types.
+        totals_storage (FiletypeInfoStorage): Storage for overall totals.
+        bigfiles_storage (FiletypeInfoStorage): Storage for big files information.
+        errored_files_count (int): Number of files that encountered errors during analysis.
+        size_threshold (float): The size threshold in GB for big files.
+
+    Returns:
+        str: The table, one row per line.
+    """
+    header_row = ("Media type", "Files found", "Size")
+    type_rows = [
+        build_storage_row(storage.displayable_name, storage)
+        for storage in (*result_storages.values(), others_storage)
+    ]
+    bigfiles_row = build_storage_row("Big Files", bigfiles_storage)
+    errors_row = ("Errors", str(errored_files_count), "n/a")
+    totals_row = build_storage_row("Totals", totals_storage)
+
+    rows = [header_row, *type_rows, bigfiles_row, errors_row, totals_row]
+    widths = [max(len(row[column]) for row in rows) for column in range(len(header_row))]
+
+    def format_row(row: tuple[str, str, str]) -> str:
+        return "  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip()
+
+    separator = "  ".join("-" * width for width in widths)
+    lines = [
+        "Directory analysis results",
+        format_row(header_row),
+        separator,
+        *(format_row(row) for row in type_rows),
+        separator,
+        format_row(bigfiles_row),
+        f"Files bigger than {size_threshold} GB",
+        separator,
+        format_row(errors_row),
+        separator,
+        format_row(totals_row),
+    ]
+    return "\n".join(lines)
+
+
 def main(
     dir_path: Annotated[str, typer.Argument(help="Path to directory that needs to be analyzed")],
     thorough: Annotated[bool, typer.Option(
@@ -413,13 +1133,30 @@ def main(
         help="Write analysis results into file")] = False,
     size_threshold: Annotated[float, typer.Option(
         help="File size in GiB that gets the file marked as big")] = 1,
-    no_estimate: Annotated[bool, typer.Option(
-        "--no-estimate",
-        help="Count the files in the filesystem for time estimate and progress bar")] = False,
+    estimate: Annotated[bool, typer.Option(
+        "--estimate",
+        help="Estimate the number of files beforehand for time estimate and progress bar")] = False,
+    exact_estimate: Annotated[bool, typer.Option(
+        "--exact-estimate",
+        help="Count all the files beforehand instead of estimating their number")] = False,
     use_default_config: Annotated[bool, typer.Option(
         "--use-default-config",
-        help="Ignore config.json, if present. Do not create it, if missing")] = False,
-) -> dict[str, dict[str, FiletypeInfoStorage] | FiletypeInfoStorage | int | list[str]]:
+        help="Ignore config.json, if present")] = False,
+    write_default_config: Annotated[bool, typer.Option(
+        "--write-default-config",
+        help="Create config.json with the default configuration, if missing")] = False,
+    workers: Annotated[int, typer.Option(
+        help="Number of threads used for thorough mimetype detection")] = 1,
+    trust_extensions: Annotated[bool, typer.Option(
+        "--trust-extensions",
+        help="With --thorough, detect the content of one file per extension and reuse the result")] = False,
+    walk_threads: Annotated[int, typer.Option(
+        help="Number of threads listing directories")] = 8,
+    stat_threads: Annotated[int, typer.Option(
+        help="Number of threads reading file metadata")] = 1,
+    cache: Annotated[str | None, typer.Option(
+        help="SQLite file to cache --thorough results in and reuse them for unchanged files")] = None,
+) -> dict[str, dict[str, FiletypeInfoStorage] | FiletypeInfoStorage | int]:
     """
     Main function to analyze a directory's file system.
 
@@ -428,8 +1165,20 @@ def main(
         thorough (bool, optional): Whether to use thorough mimetype detection. Defaults to False.
         to_file (bool, optional): Whether to write analysis results to a file. Defaults to False.
         size_threshold (float, optional): File size threshold in GiB for marking files as big. Defaults to 1.
-        no_estimate (bool, optional): If True, skips file counting for time estimate and progress bar. Defaults to False.
+        estimate (bool, optional): If True, estimates the number of files beforehand for time estimate
+            and progress bar. Defaults to False.
+        exact_estimate (bool, optional): If True, counts all the files beforehand instead of estimating
+            their number. Defaults to False.
         use_default_config (bool, optional): If True, uses default configuration instead of config.json. Defaults to False.
+        write_default_config (bool, optional): If True, creates config.json with the default configuration
+            if it doesn't exist. Defaults to False.
+        workers (int, optional): Number of threads used for thorough mimetype detection. Defaults to 1.
+        trust_extensions (bool, optional): If True, thorough detection reuses the mimetype of the first file
+            with the same extension. Defaults to False.
+        walk_threads (int, optional): Number of threads listing directories. Defaults to 8.
+        stat_threads (int, optional): Number of threads reading file metadata. Defaults to 1.
+        cache (str | None, optional): Path to an SQLite file caching thorough detection results by file path,
+            reused while the file's mtime and size are unchanged. Defaults to None.
 
     Returns:
         dict: A dictionary containing the following keys:
@@ -438,37 +1187,65 @@ def main(
             - "totals_storage": FiletypeInfoStorage for total file statistics.
             - "big_files_storage": FiletypeInfoStorage for files exceeding size threshold.
             - "errored_files_count": Number of files that couldn't be processed due to errors.
-            - "permission_warnings": List of paths with permission issues.
+            - "permission_warnings_count": Number of permission warnings written to the permissions output file.
     """
+    if write_default_config:
+        create_default_config(CONFIG_PATH)
     if use_default_config:
-        config = DEFAULT_CONFIG
+        config = copy.deepcopy(DEFAULT_CONFIG)
     else:
         config = get_config()
     check_path(dir_path)
     check_size_threshold(size_threshold)
-
-    if no_estimate:
-        file_count = None
-    else:
-        file_count = count_files(dir_path)
-        print(f"Preliminary file count: {file_count}")
-
-    analysis_start_dt = datetime.now()
-    (
-        result_storages,
-        others_storage,
-        totals_storage,
-        big_files_storage,
-        permission_warnings,
-        errored_files_count
-    ) = analyze_filesystem(
-        dir_path,
-        config["searchable_types"],
-        thorough,
-        size_threshold,
-        file_count=file_count
-    )
-    analysis_duration = datetime.now() - analysis_start_dt
+    check_workers(workers)
+    check_workers(walk_threads, "number of walk threads")
+    check_workers(stat_threads, "number of stat threads")
+    check_cache(cache, thorough)
+
+    with (
+        open(config["paths"]["bigfiles_output_path"], 'w', buffering=OUTPUT_BUFFER_SIZE) as bigfiles_output,
+        open(config["paths"]["permissions_output_path"], 'w', buffering=OUTPUT_BUFFER_SIZE) as permissions_output,
+        Progress(
+            *PROGRESS_COLUMNS,
+            refresh_per_second=10,
+            speed_estimate_period=1,
+            transient=True,
+        ) as progress,
+        closing(open_mimetype_cache(cache)) if cache else nullcontext() as mimetype_cache,
+    ):
+        if exact_estimate:
+            file_count = count_files(dir_path, progress, walk_threads)
+            print(f"Preliminary file count: {file_count}")
+        elif estimate:
+            file_count = estimate_file_count(dir_path)
+            print(f"Estimated file count: {file_count}")
+        else:
+            file_count = None
+
+        analysis_start_dt = datetime.now()
+        (
+            result_storages,
+            others_storage,
+            totals_storage,
+            big_files_storage,
+            permission_warnings_count,
+            errored_files_count
+        ) = analyze_filesystem(
+            dir_path,
+            config["searchable_types"],
+            thorough,
+            size_threshold,
+            progress,
+            bigfiles_output,
+            permissions_output,
+            file_count=file_count,
+            workers=workers,
+            trust_extensions=trust_extensions,
+            walk_threads=walk_threads,
+            stat_threads=stat_threads,
+            mimetype_cache=mimetype_cache,
+        )
+        analysis_duration = datetime.now() - analysis_start_dt
 
     rich_table = build_rich_table(
         result_storages, others_storage,
@@ -478,24 +1255,21 @@ def main(
     print(f"Analysis duration: {analysis_duration}")
     if to_file:
         output_path = config["paths"]["analysis_output_path"]
+        plain_table = build_plain_table(
+            result_storages, others_storage,
+            totals_storage, big_files_storage, errored_files_count, size_threshold)
         with open(config["paths"]["analysis_output_path"], 'w') as file:
-            console = Console(file=file)
-            console.print(rich_table)
-            console.print(f"Analysis duration: {analysis_duration}")
+            file.write(f"{plain_table}\n")
+            file.write(f"Analysis duration: {analysis_duration}\n")
         print(f"Analysis results written in '{output_path}'")
 
-    with open(config["paths"]["bigfiles_output_path"], 'w') as f:
-        f.write("\n".join(big_files_storage.found_files_paths))
-    with open(config["paths"]["permissions_output_path"], 'w') as f:
-        f.write("\n".join(permission_warnings))
-
     return {
         "result_storages": result_storages,
         "others_storage": others_storage,
         "totals_storage": totals_storage,
         "big_files_storage": big_files_storage,
         "errored_files_count": errored_files_count,
-        "permission_warnings": permission_warnings,
+        "permission_warnings_count": permission_warnings_count,
     }
 
 
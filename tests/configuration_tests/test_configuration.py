@@ -0,0 +1,11 @@
+from pathlib import Path
+
+from configuration import DEFAULT_CONFIG, load_config
+
+
+def test_missing_config_is_a_copy_of_default(tmp_path: Path):
+    config = load_config(str(tmp_path / "config.json"))
+    assert config == DEFAULT_CONFIG
+
+    config["paths"]["bigfiles_output_path"] = "elsewhere.txt"
+    assert DEFAULT_CONFIG["paths"]["bigfiles_output_path"] != "elsewhere.txt"
@@ -0,0 +1,16 @@
+import os
+from typing import Any, Generator
+
+import pytest
+
+from configuration import DEFAULT_CONFIG
+
+
+@pytest.fixture(scope="session", autouse=True)
+def output_paths(tmp_path_factory: pytest.TempPathFactory) -> Generator[dict[str, str], Any, None]:
+    # main() writes its outputs to the paths of the default config, relative to the working directory.
+    output_dir = tmp_path_factory.mktemp("outputs")
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        for path_name, path in list(DEFAULT_CONFIG["paths"].items()):
+            monkeypatch.setitem(DEFAULT_CONFIG["paths"], path_name, str(output_dir / os.path.basename(path)))
+        yield DEFAULT_CONFIG["paths"]
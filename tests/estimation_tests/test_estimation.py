@@ -0,0 +1,28 @@
+from pathlib import Path
+
+from dir_analyzer import count_files, estimate_file_count
+from rich.progress import Progress
+
+
+def create_tree(root: Path, depth: int, subdirs: int, files: int) -> None:
+    for file_index in range(files):
+        (root / f"file_{file_index}.txt").touch()
+    if depth == 0:
+        return
+    for dir_index in range(subdirs):
+        subdir = root / f"dir_{dir_index}"
+        subdir.mkdir()
+        create_tree(subdir, depth - 1, subdirs, files)
+
+
+def test_estimate_uniform_tree(tmp_path: Path):
+    # Every path down a uniform tree sees the same branching, so the estimate is exact.
+    create_tree(tmp_path, depth=3, subdirs=3, files=2)
+    with Progress(disable=True) as progress:
+        file_count = count_files(str(tmp_path), progress)
+    assert file_count == 80
+    assert estimate_file_count(str(tmp_path), probes=8) == file_count
+
+
+def test_estimate_empty_dir(tmp_path: Path):
+    assert estimate_file_count(str(tmp_path)) == 0
@@ -0,0 +1,31 @@
+from dir_analyzer import FiletypeInfoStorage, build_plain_table
+
+
+def test_plain_table():
+    result_storages = {
+        "Text": FiletypeInfoStorage("text/", "Text", found_files=12, found_size=100),
+        "Application": FiletypeInfoStorage("application/", "Application", found_files=3, found_size=2048),
+    }
+    plain_table = build_plain_table(
+        result_storages,
+        others_storage=FiletypeInfoStorage("None", "Other"),
+        totals_storage=FiletypeInfoStorage("None", "Total", found_files=15, found_size=2148),
+        bigfiles_storage=FiletypeInfoStorage("None", "Big"),
+        errored_files_count=2,
+        size_threshold=0.5,
+    )
+    assert plain_table.splitlines() == [
+        "Directory analysis results",
+        "Media type   Files found  Size",
+        "-----------  -----------  ---------",
+        "Text         12           100 Bytes",
+        "Application  3            2.0 kB",
+        "Other        0            0 Bytes",
+        "-----------  -----------  ---------",
+        "Big Files    0            0 Bytes",
+        "Files bigger than 0.5 GB",
+        "-----------  -----------  ---------",
+        "Errors       2            n/a",
+        "-----------  -----------  ---------",
+        "Totals       15           2.1 kB",
+    ]
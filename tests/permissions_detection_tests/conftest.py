@@ -1,13 +1,12 @@
-import os
 from pathlib import Path
 from typing import Any, Generator
 
 import pytest
 
+from configuration import DEFAULT_CONFIG
 from dir_analyzer import FiletypeInfoStorage, main
 
-TEMPORARY_DIR_PATH = Path(os.path.dirname(
-    os.path.realpath(__file__))) / 'permissions_temp'
+TEMPORARY_DIR_PATH = Path(__file__).resolve().parent / 'permissions_temp'
 
 
 @pytest.fixture(scope="package")
@@ -35,5 +34,16 @@ def create_files() -> Generator[Path, Any, None]:
 
 
 @pytest.fixture(scope="package")
-def analysis_output(create_files: Path) -> dict[str, dict[str, FiletypeInfoStorage] | FiletypeInfoStorage | int | list[str]]:
+def permissions_output_path(tmp_path_factory: pytest.TempPathFactory) -> Generator[Path, Any, None]:
+    # A path of its own, so that analyses run by other tests can't overwrite the warnings.
+    output_path = tmp_path_factory.mktemp("permissions_outputs") / "permissions.txt"
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setitem(DEFAULT_CONFIG["paths"], "permissions_output_path", str(output_path))
+        yield output_path
+
+
+@pytest.fixture(scope="package")
+def analysis_output(
+        create_files: Path, permissions_output_path: Path
+) -> dict[str, dict[str, FiletypeInfoStorage] | FiletypeInfoStorage | int]:
     return main(str(TEMPORARY_DIR_PATH), use_default_config=True)
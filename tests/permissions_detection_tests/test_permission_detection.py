@@ -1,24 +1,48 @@
+import os
+import stat
+from pathlib import Path
+
 import pytest
-from dir_analyzer import FiletypeInfoStorage
+from dir_analyzer import FiletypeInfoStorage, analyze_file_permissions
+
+pytestmark = pytest.mark.skipif(
+    os.name != "posix", reason="permissions are only checked on POSIX systems")
 
 
 def test_analysis_output(
         analysis_output: dict[str, dict[str, FiletypeInfoStorage]
-                              | FiletypeInfoStorage | int | list[str]]
+                              | FiletypeInfoStorage | int]
 ):
-    assert "permission_warnings" in analysis_output
-    assert isinstance(analysis_output["permission_warnings"], list)
+    assert "permission_warnings_count" in analysis_output
+    assert isinstance(analysis_output["permission_warnings_count"], int)
 
 
 @pytest.fixture
 def permission_warnings(
         analysis_output: dict[str, dict[str, FiletypeInfoStorage]
-                              | FiletypeInfoStorage | int | list[str]]
+                              | FiletypeInfoStorage | int],
+        permissions_output_path: Path
 ) -> list[str]:
-    return analysis_output["permission_warnings"]
+    with open(permissions_output_path) as f:
+        return f.read().splitlines()
+
 
 def test_permissions(
+        analysis_output: dict[str, dict[str, FiletypeInfoStorage]
+                              | FiletypeInfoStorage | int],
         permission_warnings: list[str]
 ):
+    assert analysis_output["permission_warnings_count"] == 3
     assert len(permission_warnings) == 3
-    
+
+
+def test_file_permissions_combined_flags():
+    warnings = analyze_file_permissions("file", stat.S_IFREG | 0o4757)
+    assert warnings == [
+        "WARNING: world-writable - 'file'",
+        "WARNING: SUID is set - 'file'",
+    ]
+
+
+def test_file_permissions_unflagged():
+    assert analyze_file_permissions("file", stat.S_IFREG | 0o755) == []
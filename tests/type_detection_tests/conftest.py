@@ -0,0 +1,48 @@
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+from pytest import FixtureRequest
+
+from dir_analyzer import FiletypeInfoStorage, main
+
+LOCALDIR_PATH = Path(__file__).resolve().parent
+DATA_DIR_PATH = str(LOCALDIR_PATH / "data")
+EXPECTED_RESULTS_PATH = LOCALDIR_PATH / "expected.json"
+
+
+@pytest.fixture(scope="session")
+def data_dir_path() -> str:
+    return DATA_DIR_PATH
+
+
+@pytest.fixture(scope="session", params=[False, True], ids=["shallow", "thorough"])
+def thorough(request: FixtureRequest) -> bool:
+    return request.param
+
+
+@pytest.fixture(scope="session")
+def analysis_output(
+        data_dir_path: str, thorough: bool
+) -> dict[str, dict[str, FiletypeInfoStorage] | FiletypeInfoStorage | int]:
+    return main(data_dir_path, thorough=thorough, use_default_config=True)
+
+
+@pytest.fixture(scope="session")
+def expected_results() -> dict[str, Any]:
+    # Content detection sorts unknown.xyz as text, while its extension leaves it among the others.
+    with open(EXPECTED_RESULTS_PATH) as f:
+        return json.load(f)
+
+
+@pytest.fixture(scope="session")
+def tested_types(expected_results: dict[str, Any], thorough: bool) -> list[tuple[str, int, int]]:
+    mode = "thorough" if thorough else "shallow"
+    return [tuple(entry) for entry in expected_results[mode]["tested_types"]]
+
+
+@pytest.fixture(scope="session")
+def expected_others(expected_results: dict[str, Any], thorough: bool) -> tuple[int, int]:
+    mode = "thorough" if thorough else "shallow"
+    return tuple(expected_results[mode]["others"])
@@ -0,0 +1,101 @@
+import os
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import Any
+
+import pytest
+import typer
+
+import dir_analyzer
+from dir_analyzer import FiletypeInfoStorage, main
+
+from .test_trusted_extensions import JPEG_HEADER
+
+
+def fail_content_detection(target_path: str, regular_file: bool) -> str:
+    raise AssertionError(f"'{target_path}' was detected again instead of read from the cache")
+
+
+@pytest.fixture(scope="module")
+def cache_path(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    return tmp_path_factory.mktemp("cache") / "mimetypes.sqlite"
+
+
+@pytest.fixture(scope="module")
+def analysis_outputs(
+        data_dir_path: str, cache_path: Path
+) -> list[dict[str, dict[str, FiletypeInfoStorage] | FiletypeInfoStorage | int]]:
+    cold_output = main(data_dir_path, thorough=True, use_default_config=True, cache=str(cache_path))
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(dir_analyzer, "detect_content_mimetype", fail_content_detection)
+        warm_output = main(data_dir_path, thorough=True, use_default_config=True, cache=str(cache_path))
+    return [cold_output, warm_output]
+
+
+def test_cache_filled(analysis_outputs: list[dict[str, Any]], cache_path: Path):
+    with closing(sqlite3.connect(cache_path)) as connection:
+        (cached_count,) = connection.execute("SELECT COUNT(*) FROM mimetypes").fetchone()
+    assert cached_count == analysis_outputs[0]["totals_storage"].found_files
+
+
+@pytest.mark.parametrize("run", [0, 1])
+def test_findings(analysis_outputs: list[dict[str, Any]], run: int, expected_results: dict[str, Any]) -> None:
+    tested_types = [tuple(entry) for entry in expected_results["thorough"]["tested_types"]]
+    result_storages = analysis_outputs[run]["result_storages"]
+    findings = [
+        (name, result_storages[name].found_files, result_storages[name].found_size)
+        for name, _, _ in tested_types
+    ]
+    assert findings == tested_types
+
+
+def test_cached_mimetype_used(tmp_path: Path):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    (data_dir / "notes.txt").write_text("some notes\n")
+    cache_path = str(tmp_path / "mimetypes.sqlite")
+    main(str(data_dir), thorough=True, use_default_config=True, cache=cache_path)
+    with closing(sqlite3.connect(cache_path)) as connection, connection:
+        connection.execute("UPDATE mimetypes SET mime_type = 'image/png'")
+
+    analysis_output = main(str(data_dir), thorough=True, use_default_config=True, cache=cache_path)
+
+    assert analysis_output["result_storages"]["Image"].found_files == 1
+    assert analysis_output["result_storages"]["Text"].found_files == 0
+
+
+def test_cache_shared_between_relative_and_absolute_paths(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    (data_dir / "notes.txt").write_text("some notes\n")
+    cache_path = str(tmp_path / "mimetypes.sqlite")
+    main(str(data_dir), thorough=True, use_default_config=True, cache=cache_path)
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(dir_analyzer, "detect_content_mimetype", fail_content_detection)
+    analysis_output = main("data", thorough=True, use_default_config=True, cache=cache_path)
+
+    assert analysis_output["result_storages"]["Text"].found_files == 1
+
+
+def test_trusted_results_not_reused_untrusted(tmp_path: Path):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    (data_dir / "photo.jpg").write_bytes(JPEG_HEADER)
+    (data_dir / "notes.jpg").write_text("not a picture\n")
+    cache_path = str(tmp_path / "mimetypes.sqlite")
+    main(str(data_dir), thorough=True, trust_extensions=True, use_default_config=True, cache=cache_path)
+
+    analysis_output = main(str(data_dir), thorough=True, use_default_config=True, cache=cache_path)
+
+    result_storages = analysis_output["result_storages"]
+    assert result_storages["Image"].found_files == 1
+    assert result_storages["Text"].found_files == 1
+
+
+def test_cache_requires_thorough(tmp_path: Path):
+    cache_path = tmp_path / "mimetypes.sqlite"
+    with pytest.raises(typer.Exit):
+        main(str(tmp_path), use_default_config=True, cache=str(cache_path))
+    assert not os.path.exists(cache_path)
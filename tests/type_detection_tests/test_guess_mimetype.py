@@ -0,0 +1,18 @@
+import mimetypes
+
+import pytest
+
+from dir_analyzer import guess_mimetype
+
+# Each compressed name comes after a name whose mimetype shouldn't be reused for it.
+GUESSED_NAMES = [
+    "a.tar.Z", "b.Z", "c.txt.Z",
+    "a.tar.gz", "b.gz", "c.txt.gz",
+    "a.TXT", "b.txt",
+]
+
+
+@pytest.mark.parametrize("file_name", GUESSED_NAMES)
+def test_guess_matches_mimetypes(file_name: str):
+    mime_type, _ = mimetypes.guess_type(file_name, strict=False)
+    assert guess_mimetype(file_name) == (mime_type or "")
@@ -0,0 +1,36 @@
+from pathlib import Path
+
+from dir_analyzer import main
+
+JPEG_HEADER = b"\xff\xd8\xff\xe0\x00\x10JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00"
+
+
+def test_extensions_not_shared_between_runs(tmp_path: Path):
+    images_dir = tmp_path / "images"
+    images_dir.mkdir()
+    (images_dir / "photo.jpg").write_bytes(JPEG_HEADER)
+    texts_dir = tmp_path / "texts"
+    texts_dir.mkdir()
+    (texts_dir / "notes.jpg").write_text("not a picture\n")
+
+    main(str(images_dir), thorough=True, trust_extensions=True, use_default_config=True)
+    analysis_output = main(str(texts_dir), thorough=True, trust_extensions=True, use_default_config=True)
+
+    result_storages = analysis_output["result_storages"]
+    assert result_storages["Text"].found_files == 1
+    assert result_storages["Image"].found_files == 0
+
+
+def test_empty_file_not_trusted(tmp_path: Path):
+    # The empty file is in the root directory, so it is the first .txt file analyzed.
+    (tmp_path / "empty.txt").touch()
+    texts_dir = tmp_path / "texts"
+    texts_dir.mkdir()
+    for text_index in range(5):
+        (texts_dir / f"notes_{text_index}.txt").write_text("some notes\n")
+
+    analysis_output = main(
+        str(tmp_path), thorough=True, trust_extensions=True, walk_threads=1, use_default_config=True)
+
+    assert analysis_output["result_storages"]["Text"].found_files == 5
+    assert analysis_output["others_storage"].found_files == 1